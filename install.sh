@@ -24,7 +24,7 @@ echo "Upgrading pip..."
 pip install --upgrade pip
 
 echo "Installing Python packages..."
-pip install streamlit pandas pyyaml
+pip install streamlit pandas pyyaml pyarrow
 
 echo
 echo "Done."
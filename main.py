@@ -1,77 +1,433 @@
+from __future__ import annotations
+
 import os
 from datetime import datetime
-import pandas as pd
+from functools import partial
+from typing import TYPE_CHECKING
+
 import streamlit as st
-import yaml
 
 from style import apply_ios_style
 
+# pandas and yaml are imported where they're used. A bare `import main` doesn't
+# load them, and yaml is only needed when the config cache is cold; in the running
+# app pandas still loads on the first data access, then stays in sys.modules
+if TYPE_CHECKING:
+    import pandas as pd
+
 
 # ================= DATA HANDLER ================= #
 
+import json
+import logging
 import os
-from datetime import datetime, timedelta
-import pandas as pd
+import threading
+from datetime import datetime, time, timedelta
+
+logger = logging.getLogger(__name__)
+
+
+# Once the append log grows past this, upsert folds it back into the snapshot
+LOG_COMPACT_BYTES = 256 * 1024
+
+
+def _json_default(v):
+    if isinstance(v, time):
+        return v.strftime("%H:%M:%S")
+    if isinstance(v, datetime):
+        return v.isoformat()
+    raise TypeError(f"Cannot serialize {type(v).__name__} to the wellness log")
+
+
+# Built once: json.dumps(..., default=...) would construct a new encoder per save
+_LOG_ENCODER = json.JSONEncoder(default=_json_default, separators=(",", ":"))
+
+
+@st.cache_resource
+def _log_lock() -> threading.Lock:
+    # Serializes appends against compaction across sessions (threads of one
+    # process). Cached rather than module-level: the script reruns every time.
+    return threading.Lock()
+
+
+def build_date_index(df: pd.DataFrame) -> dict:
+    """
+    Map each "date" to the position of its (first) row, for O(1) lookups.
+    """
+    if "date" not in df.columns:
+        return {}
+    date_index = {}
+    for i, d in enumerate(df["date"].tolist()):
+        date_index.setdefault(d, i)
+    return date_index
+
+
+def _apply_update(
+    df: pd.DataFrame, day_str: str, updates: dict, now, date_index: dict
+) -> pd.DataFrame:
+    """
+    Insert or update the row for day_str; date_index is kept in step with df.
+    """
+    import pandas as pd
+
+    pos = date_index.get(day_str)
+    _make_room(df, updates)
+
+    if pos is None:
+        row = {"date": day_str, "timestamp": now}
+        row.update(updates)
+        if df.empty:
+            df = pd.DataFrame([row])
+        else:
+            # Enlarge in place: unlike concat this keeps the narrow dtypes (concat
+            # turns Int8 into Int64 and string into object). Unseen fields are
+            # added in one reindex rather than one column insert each, as object
+            # columns (pd.NA fill) so they take a value of any type.
+            missing = [k for k in row if k not in df.columns]
+            if missing:
+                df = df.reindex(columns=[*df.columns, *missing], fill_value=pd.NA)
+                if "timestamp" in missing:
+                    df["timestamp"] = pd.to_datetime(df["timestamp"])
+            df.loc[len(df), list(row)] = list(row.values())
+        date_index[day_str] = len(df) - 1
+    else:
+        idx = df.index[pos]
+        # One indexer call for the whole block instead of one per field
+        if updates:
+            df.loc[idx, list(updates.keys())] = list(updates.values())
+        df.at[idx, "timestamp"] = now
+    return df
+
+
+# Bounded so stale mtime keys don't pile up copies of the history in memory
+@st.cache_data(max_entries=4, ttl=300, show_spinner=False)
+def _cached_load(filename: str, log_filename: str, mtime: tuple) -> pd.DataFrame:
+    import pandas as pd
+
+    # mtime is only part of the cache key: a changed file gets a fresh entry
+    if os.path.exists(filename):
+        # Feather keeps dtypes, so timestamps come back as datetime64 without re-parsing.
+        # Copy because some columns (categoricals) are read-only views of the Arrow
+        # buffers, and the log replay below writes into them.
+        df = pd.read_feather(filename).copy()
+    else:
+        df = pd.DataFrame()
+
+    # Replay saves made since the last compaction, in the order they happened.
+    # Days not in the snapshot are buffered as dicts and appended with a single
+    # concat at the end, instead of one full-frame copy per new day.
+    if os.path.exists(log_filename):
+        date_index = build_date_index(df)
+        pending = []
+        pending_index = {}
+        with open(log_filename, "r") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A save cut off mid-write (crash, power loss); drop just that one
+                    logger.warning("Skipping unreadable line in %s", log_filename)
+                    continue
+                day_str = record.pop("date")
+                now = pd.Timestamp(record.pop("timestamp"))
+                if day_str in date_index:
+                    df = _apply_update(df, day_str, record, now, date_index)
+                elif day_str in pending_index:
+                    row = pending[pending_index[day_str]]
+                    row.update(record)
+                    row["timestamp"] = now
+                else:
+                    pending_index[day_str] = len(pending)
+                    pending.append({"date": day_str, "timestamp": now, **record})
+        if pending:
+            new_rows = pd.DataFrame(pending)
+            if df.empty:
+                df = new_rows
+            else:
+                # concat widens the nullable dtypes; put the snapshot's back where they fit
+                dtypes = {
+                    col: df[col].dtype.name
+                    for col in df.columns
+                    if isinstance(df[col].dtype, pd.api.extensions.ExtensionDtype)
+                }
+                df = _cast_checked(pd.concat([df, new_rows], ignore_index=True), dtypes)
+    return df
+
+
+# Config field type -> storage dtype (sliders and clamped int numbers are sized by
+# their range; float numbers stay float64 so typed decimals like 7.7 round-trip exactly)
+FIELD_DTYPES = {
+    "checkbox": "boolean",
+    "select": "category",
+    "text": "string",
+    "textarea": "string",
+    "time": "string",
+}
+
+
+def _int_dtype(lo, hi) -> str:
+    # Only for widgets that clamp to [lo, hi]
+    if lo is not None and hi is not None and -128 <= lo and hi <= 127:
+        return "Int8"
+    return "Int32"
+
+
+def _int_fits(values: pd.Series, dtype: str) -> bool:
+    """
+    Whether every value in `values` can be stored as the integer dtype `dtype`
+    without wrapping or losing a fraction.
+    """
+    import numpy as np
+    import pandas as pd
+
+    numeric = pd.to_numeric(values, errors="coerce")
+    if numeric.isna().sum() != values.isna().sum():
+        return False  # something non-numeric in there
+    numeric = numeric.dropna()
+    if numeric.empty:
+        return True
+    info = np.iinfo(dtype.lower())
+    return bool(
+        (numeric == numeric.round()).all()
+        and info.min <= numeric.min()
+        and numeric.max() <= info.max
+    )
+
+
+def build_dtype_map(blocks_conf: list) -> dict:
+    """
+    Narrowest dtype for each configured field, used both when reading a
+    legacy CSV and when writing the feather snapshot.
+    """
+    dtypes = {}
+    for block in blocks_conf:
+        for field in block["fields"]:
+            ftype = field["type"]
+            if ftype == "number":
+                if field.get("subtype", "float") != "int":
+                    dtypes[field["name"]] = "float64"
+                elif field.get("allow_none", False):
+                    # Rendered as a text box, which doesn't enforce min/max
+                    dtypes[field["name"]] = "Int64"
+                else:
+                    dtypes[field["name"]] = _int_dtype(field.get("min"), field.get("max"))
+            elif ftype == "slider":
+                dtypes[field["name"]] = _int_dtype(field.get("min", 0), field.get("max", 10))
+            elif ftype in FIELD_DTYPES:
+                dtypes[field["name"]] = FIELD_DTYPES[ftype]
+    return dtypes
+
+
+@st.cache_resource(max_entries=1)
+def load_dtype_map(path: str) -> dict:
+    # Built once per config rather than by every rerun's WellnessDataHandler
+    return build_dtype_map(load_config(path)["blocks"])
+
+
+def _cast_checked(df: pd.DataFrame, dtypes: dict) -> pd.DataFrame:
+    """
+    Cast columns of df to the dtype names in `dtypes`, leaving any column whose
+    data doesn't fit as it is.
+    """
+    for col, dtype in dtypes.items():
+        if col not in df.columns or df[col].dtype == dtype:
+            continue
+        # astype wraps out-of-range ints silently (200 -> -56 in Int8), so check first
+        if dtype.startswith(("Int", "int")) and not _int_fits(df[col], dtype):
+            continue
+        try:
+            df[col] = df[col].astype(dtype, copy=False)
+        except (TypeError, ValueError, OverflowError):
+            pass
+    return df
+
+
+def _make_room(df: pd.DataFrame, values: dict):
+    """
+    Prepare narrow columns to take `values`: categoricals reject unseen values,
+    and a value outside an integer column's range would overflow (or wrap), so
+    those columns are registered / widened first.
+    """
+    import pandas as pd
+
+    for k, v in values.items():
+        if v is None or k not in df.columns:
+            continue
+        dtype = df[k].dtype.name
+        if dtype == "category":
+            if v not in df[k].cat.categories:
+                df[k] = df[k].cat.add_categories([v])
+        elif dtype in ("Int8", "Int16", "Int32", "int8", "int16", "int32"):
+            if not _int_fits(pd.Series([v]), dtype):
+                wide = "Int64" if isinstance(v, int) else "float64"
+                df[k] = df[k].astype(wide)
 
 
 class WellnessDataHandler:
-    def __init__(self, filename: str):
-        self.filename = filename
+    def __init__(self, filename: str, dtypes: dict = None):
+        # Older configs point at a .csv file; store next to it as .feather instead
+        root, ext = os.path.splitext(filename)
+        self.legacy_filename = filename if ext == ".csv" else root + ".csv"
+        self.filename = root + ".feather"
+        self.log_filename = root + ".log"
+        # Set by the app from st.session_state; None means "read from disk".
+        # data_key is the mtime_key() the frame was loaded at.
+        self.df = None
+        self.date_index = None
+        self.data_key = None
+        self.dtypes = dtypes or {}
+        self._migrate_legacy_csv()
+
+    def _migrate_legacy_csv(self):
+        """
+        One-shot conversion of an existing CSV log into the feather store.
+        The CSV is left in place as a backup.
+        """
+        if os.path.exists(self.filename) or not os.path.exists(self.legacy_filename):
+            return
+
+        import pandas as pd
+
+        # Explicit dtypes spare the parser its inference pass. Integer columns are
+        # read as float64, because read_csv would wrap out-of-range values into a
+        # narrow int dtype; save_data's range-checked cast narrows them afterwards.
+        # Very old files may lack "timestamp", and parse_dates raises on a missing column.
+        read_dtypes = {
+            col: "float64" if dtype.startswith("Int") else dtype
+            for col, dtype in self.dtypes.items()
+        }
+        header = pd.read_csv(self.legacy_filename, nrows=0).columns
+        df = pd.read_csv(
+            self.legacy_filename,
+            dtype=read_dtypes,
+            parse_dates=["timestamp"] if "timestamp" in header else None,
+            engine="c",
+        )
+        self.save_data(self._ensure_date_column(df))
+
+    def mtime_key(self) -> tuple:
+        """
+        (snapshot, log) modification times; changes whenever any session saves.
+        """
+        return tuple(
+            os.path.getmtime(path) if os.path.exists(path) else 0.0
+            for path in (self.filename, self.log_filename)
+        )
 
     def load_data(self) -> pd.DataFrame:
-        if not os.path.exists(self.filename):
-            return pd.DataFrame()
-        df = pd.read_csv(self.filename)
-        if "timestamp" in df.columns:
-            df["timestamp"] = pd.to_datetime(df["timestamp"])
-        return df
+        return _cached_load(self.filename, self.log_filename, self.mtime_key()).copy()
 
     def save_data(self, df: pd.DataFrame):
         folder = os.path.dirname(self.filename) or "."
         os.makedirs(folder, exist_ok=True)
-        df.to_csv(self.filename, index=False)
+        df = self._ensure_date_column(df.reset_index(drop=True))
+        df = self._narrow_dtypes(df)
+        # Write aside and swap in, so a crash never leaves a half-written snapshot
+        tmp_filename = self.filename + ".tmp"
+        df.to_feather(tmp_filename, compression="zstd")
+        os.replace(tmp_filename, self.filename)
+        _cached_load.clear()
+
+    def _narrow_dtypes(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Cast configured columns to their narrow dtypes. A column whose data
+        doesn't fit (e.g. after a config change) is left as it is.
+        """
+        return _cast_checked(df, self.dtypes)
+
+    def append_row(self, row: dict):
+        """
+        Append one save to the log instead of rewriting the whole snapshot.
+        """
+        folder = os.path.dirname(self.log_filename) or "."
+        os.makedirs(folder, exist_ok=True)
+        line = _LOG_ENCODER.encode(row) + "\n"
+        with _log_lock(), open(self.log_filename, "a+b", buffering=1 << 20) as f:
+            # If an earlier write was cut off, start on a fresh line so this
+            # record doesn't get glued onto the broken one
+            if f.seek(0, os.SEEK_END) > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    line = "\n" + line
+            f.write(line.encode("utf-8"))
+        _cached_load.clear()
+
+    def compact(self) -> pd.DataFrame:
+        """
+        Fold the log into the snapshot. Works from a fresh load of snapshot +
+        log, so saves made by other sessions are kept; holding the log lock
+        means none can land between that load and the log's removal.
+        """
+        with _log_lock():
+            df = self._ensure_date_column(self.load_data())
+            # Snapshot first: if we die before the log is removed, replaying it again is harmless
+            self.save_data(df)
+            if os.path.exists(self.log_filename):
+                os.remove(self.log_filename)
+        return df
 
     def _ensure_date_column(self, df: pd.DataFrame) -> pd.DataFrame:
-        if "date" not in df.columns:
-            if "timestamp" in df.columns:
-                df["date"] = pd.to_datetime(df["timestamp"]).dt.strftime("%Y-%m-%d")
-            else:
-                df["date"] = pd.NaT
+        import pandas as pd
+
+        # "date" is persisted with every row, so this is normally a no-op
+        if "date" in df.columns and df["date"].notna().all():
+            return df
+        if "timestamp" in df.columns:
+            dates = pd.to_datetime(df["timestamp"]).dt.strftime("%Y-%m-%d")
+            df["date"] = df["date"].fillna(dates) if "date" in df.columns else dates
+        elif "date" not in df.columns:
+            df["date"] = pd.NaT
         return df
 
-    def upsert_for_date(self, day_str: str, updates: dict):
-        df = self.load_data()
+    def _current(self) -> tuple:
+        key = self.mtime_key()
+        if self.df is not None and self.data_key == key:
+            return self.df, self.date_index
+        # No frame yet, or another session saved since it was loaded
+        df = self._ensure_date_column(self.load_data())
+        self.df, self.date_index, self.data_key = df, build_date_index(df), key
+        return self.df, self.date_index
+
+    def upsert_for_date(self, day_str: str, updates: dict) -> pd.DataFrame:
+        df, date_index = self._current()
         df = self._ensure_date_column(df)
         now = datetime.now()
 
         # If we're logging "today" but it's before 4am, write to yesterday instead
-        today_str = now.strftime("%Y-%m-%d")
-        if day_str == today_str and now.hour < 4:
+        # (hour check first: the date formatting only runs in that window)
+        if now.hour < 4 and day_str == now.strftime("%Y-%m-%d"):
             day_str = (now - timedelta(days=1)).strftime("%Y-%m-%d")
 
-        mask = df["date"] == day_str
-
-        if not mask.any():
-            row = {"date": day_str, "timestamp": now}
-            row.update(updates)
-            df = pd.concat([df, pd.DataFrame([row])], ignore_index=True)
-        else:
-            idx = df[mask].index[0]
-            for k, v in updates.items():
-                df.loc[idx, k] = v
-            df.loc[idx, "timestamp"] = now
-
-        self.save_data(df)
+        # time_input values are stored as "HH:MM:SS" strings, same as the CSV did
+        updates = {
+            k: v.strftime("%H:%M:%S") if isinstance(v, time) else v
+            for k, v in updates.items()
+        }
+        df = _apply_update(df, day_str, updates, now, date_index)
+
+        row = {"date": day_str, "timestamp": now}
+        row.update(updates)
+        self.append_row(row)
+        if os.path.getsize(self.log_filename) > LOG_COMPACT_BYTES:
+            df = self.compact()
+            date_index = build_date_index(df)
+
+        self.df = df
+        self.date_index = date_index
+        self.data_key = self.mtime_key()
+        return df
 
     def get_for_date(self, day_str: str) -> dict:
-        df = self.load_data()
-        if df.empty:
-            return {}
-        df = self._ensure_date_column(df)
-        row = df[df["date"] == day_str]
-        if row.empty:
+        import pandas as pd
+
+        df, date_index = self._current()
+        pos = date_index.get(day_str)
+        if pos is None:
             return {}
-        return row.iloc[0].to_dict()
+        # Nullable columns hold pd.NA, which the widgets can't take; hand out None
+        return {k: None if pd.isna(v) else v for k, v in df.iloc[pos].items()}
 
 
 # ================= HELPERS ================= #
@@ -93,14 +449,26 @@ def get_subjective_average(entry) -> float:
         return float("nan")
 
 
-def get_or_default(d: dict, key: str, default):
-    v = d.get(key, default)
-    try:
-        if pd.isna(v):
-            return default
-    except Exception:
-        pass
-    return v
+# Ratings that count towards the "Overall Vibe" as-is / inverted (10 - x)
+POSITIVE_RATINGS = ["motivation", "mental_clarity", "mood_content", "productivity"]
+NEGATIVE_RATINGS = ["fatigue", "stress", "overstimulation"]
+
+
+def get_subjective_averages(df: pd.DataFrame) -> pd.Series:
+    """
+    Vectorized get_subjective_average over every row of df. Rows with a
+    missing or non-numeric rating (or a missing column) come out as NaN.
+    """
+    import pandas as pd
+
+    def ratings(cols):
+        block = df.reindex(columns=cols).apply(pd.to_numeric, errors="coerce")
+        return block.astype("float32").sum(axis=1, skipna=False)
+
+    n = len(POSITIVE_RATINGS) + len(NEGATIVE_RATINGS)
+    score = ratings(POSITIVE_RATINGS) + 10.0 * len(NEGATIVE_RATINGS) - ratings(NEGATIVE_RATINGS)
+    # Round in float64 so 7.7 prints as 7.7, not float32's 7.699999...
+    return (score / n).astype("float64").round(1)
 
 
 def get_entry_day(now: datetime = None, cutoff_hour: int = 4) -> str:
@@ -114,9 +482,103 @@ def get_entry_day(now: datetime = None, cutoff_hour: int = 4) -> str:
     return now.strftime("%Y-%m-%d")
 
 
+@st.cache_resource(max_entries=1)
 def load_config(path: str = "config.yaml") -> dict:
+    """
+    Parsed once per process and shared by every session, so treat the
+    returned dict as read-only. Restart the app to pick up config edits.
+    """
+    import yaml
+
+    # libyaml-backed loader when PyYAML was built with it
+    try:
+        from yaml import CSafeLoader as Loader
+    except ImportError:
+        from yaml import SafeLoader as Loader
+
     with open(path, "r") as f:
-        return yaml.safe_load(f)
+        return yaml.load(f, Loader=Loader)
+
+
+@st.cache_resource(max_entries=1)
+def compile_blocks(path: str) -> list:
+    """
+    Resolve the per-block layout settings and bind each field's renderer once
+    per config (cached alongside load_config), so reruns don't redo the .get()
+    defaults and column clamping.
+    """
+    compiled = []
+    for block in load_config(path)["blocks"]:
+        n_cols = block.get("n_cols", 1)
+        fields = [
+            (
+                max(0, min(field.get("col", 0), n_cols - 1)),
+                field["name"],
+                f"{block['id']}__{field['name']}",
+                compile_field_renderer(field),
+            )
+            for field in block["fields"]
+        ]
+        compiled.append(
+            {
+                "id": block["id"],
+                "title": block["title"],
+                "expanded": block.get("expanded", True),
+                "save_label": block.get("save_label", "Save"),
+                "n_cols": n_cols,
+                "fields": fields,
+            }
+        )
+    return compiled
+
+
+def _is_blank(v) -> bool:
+    # treat special "empty" values as None
+    return v is None or (isinstance(v, str) and v.strip().lower() in {"", "none", "nan"})
+
+
+def _cast_number(v, caster):
+    if _is_blank(v):
+        return None
+    try:
+        return caster(v)
+    except (TypeError, ValueError):
+        return None
+
+
+def _cast_select(v, options: list):
+    if v in options:
+        return v
+    return options[0] if options else ""
+
+
+def _cast_slider(v, fallback):
+    # slider always needs a numeric value for UI
+    if _is_blank(v):
+        v = fallback
+    try:
+        return int(v)
+    except (TypeError, ValueError):
+        # final fallback so Streamlit never sees a non-numeric slider value
+        return int(fallback)
+
+
+def _cast_text(v) -> str:
+    return "" if v is None else str(v)
+
+
+def _cast_time(v):
+    if isinstance(v, str) and v != "now":
+        try:
+            return datetime.strptime(v, "%H:%M:%S").time()
+        except Exception:
+            pass
+    return datetime.now().time()
+
+
+def _slider_fallback(field: dict):
+    # fall back to default, then min, then 0
+    return field.get("default", field.get("min", 0))
 
 
 def cast_initial_value(field: dict, stored):
@@ -127,134 +589,146 @@ def cast_initial_value(field: dict, stored):
     v = stored if stored is not None else default
 
     if t == "number":
-        subtype = field.get("subtype", "float")
-        # treat special "empty" values as None
-        if v is None or (isinstance(v, str) and v.strip().lower() in {"", "none", "nan"}):
+        return _cast_number(v, int if field.get("subtype", "float") == "int" else float)
+    if t == "checkbox":
+        return bool(v)
+    if t == "select":
+        return _cast_select(v, field.get("options", []))
+    if t == "slider":
+        return _cast_slider(v, _slider_fallback(field))
+    if t in ("text", "textarea"):
+        return _cast_text(v)
+    if t == "time":
+        return _cast_time(v)
+    return v
+
+
+# The renderers get the config's default (and caster / options / fallback)
+# bound by compile_field_renderer, so a rerun only does the per-type cast of
+# the stored value, not the field lookups of cast_initial_value.
+
+
+def _render_number(col, stored, key, *, label, default, allow_none, caster,
+                   placeholder, default_val, kwargs):
+    init = _cast_number(stored if stored is not None else default, caster)
+
+    if allow_none:
+        # Use free-text input so it can be left blank (None)
+        raw = col.text_input(
+            label,
+            value="" if init is None else str(init),
+            key=key,
+            placeholder=placeholder,
+        ).strip()
+        if raw == "":
             return None
         try:
-            return int(v) if subtype == "int" else float(v)
-        except (TypeError, ValueError):
+            return caster(raw)
+        except ValueError:
+            # Invalid entry → treat as None
             return None
 
-    if t == "checkbox":
-        return bool(v)
+    init_val = default_val if init is None else init
+    return col.number_input(label, value=init_val, key=key, **kwargs)
 
-    if t == "select":
-        opts = field.get("options", [])
-        if v in opts:
-            return v
-        return opts[0] if opts else ""
 
-    if t == "slider":
-        # slider always needs a numeric value for UI
-        if v is None or (isinstance(v, str) and v.strip().lower() in {"", "none", "nan"}):
-            # fall back to default, then min, then 0
-            v = field.get("default", field.get("min", 0))
-        try:
-            return int(v)
-        except (TypeError, ValueError):
-            # final fallback so Streamlit never sees a non-numeric slider value
-            return int(field.get("default", field.get("min", 0)))
+def _render_checkbox(col, stored, key, *, label, default):
+    init = stored if stored is not None else default
+    return col.checkbox(label, value=bool(init), key=key)
 
-    if t in ("text", "textarea"):
-        return "" if v is None else str(v)
 
-    if t == "time":
-        if isinstance(v, str) and v != "now":
-            try:
-                return datetime.strptime(v, "%H:%M:%S").time()
-            except Exception:
-                pass
-        return datetime.now().time()
+def _render_select(col, stored, key, *, label, default, options):
+    init = _cast_select(stored if stored is not None else default, options)
+    index = options.index(init) if init in options else 0
+    return col.selectbox(label, options, index=index, key=key)
 
-    return v
 
+def _render_slider(col, stored, key, *, label, default, fallback, min_value, max_value):
+    init = _cast_slider(stored if stored is not None else default, fallback)
+    return col.slider(label, min_value, max_value, init, key=key)
 
-def render_field(field: dict, col, today_data: dict, block_id: str):
-    name = field["name"]
-    label = field["label"]
-    ftype = field["type"]
-    key = f"{block_id}__{name}"
 
-    stored = today_data.get(name, None)
-    init = cast_initial_value(field, stored)
+def _render_text(col, stored, key, *, label, default):
+    init = _cast_text(stored if stored is not None else default)
+    return col.text_input(label, value=init, key=key)
 
 
-    if ftype == "number":
-        subtype = field.get("subtype", "float")
-        allow_none = field.get("allow_none", False)
-
-        if allow_none:
-            # Use free-text input so it can be left blank (None)
-            raw = col.text_input(
-                label,
-                value="" if init is None else str(init),
-                key=key,
-                placeholder=field.get("placeholder", "Leave blank if not measured"),
-            ).strip()
-            if raw == "":
-                return None
-            try:
-                return int(raw) if subtype == "int" else float(raw)
-            except ValueError:
-                # Invalid entry → treat as None
-                return None
+def _render_textarea(col, stored, key, *, label, default, max_chars):
+    init = _cast_text(stored if stored is not None else default)
+    return col.text_area(label, value=init, key=key, max_chars=max_chars)
+
+
+def _render_time(col, stored, key, *, label, default):
+    init = _cast_time(stored if stored is not None else default)
+    return col.time_input(label, value=init, key=key)
+
+
+FIELD_RENDERERS = {
+    "number": _render_number,
+    "checkbox": _render_checkbox,
+    "select": _render_select,
+    "slider": _render_slider,
+    "text": _render_text,
+    "textarea": _render_textarea,
+    "time": _render_time,
+}
+
 
+def compile_field_renderer(field: dict):
+    """
+    Bind everything the field's widget needs from the config, leaving a
+    callable renderer(col, stored, key) for the per-rerun work. Called from
+    the cached compile_blocks, so this runs once per config load.
+    """
+    ftype = field["type"]
+    params = {"label": field["label"], "default": field.get("default")}
+
+    if ftype == "number":
         # Normalize numeric kwargs so Streamlit doesn't complain about mixed types
+        caster = int if field.get("subtype", "float") == "int" else float
         kwargs = {}
-        if subtype == "int":
-            caster = int
-        else:
-            caster = float
-
         if "min" in field:
             kwargs["min_value"] = caster(field["min"])
         if "max" in field:
             kwargs["max_value"] = caster(field["max"])
         if "step" in field:
             kwargs["step"] = caster(field["step"])
-
-        if init is None:
-            init_val = field.get("min", 0 if subtype == "int" else 0.0)
-        else:
-            init_val = int(init) if subtype == "int" else float(init)
-        init_val = caster(init_val)
-
-        return col.number_input(label, value=init_val, key=key, **kwargs)
-
-    if ftype == "checkbox":
-        return col.checkbox(label, value=bool(init), key=key)
-
-    if ftype == "select":
-        options = field.get("options", [])
-        index = 0
-        if init in options:
-            index = options.index(init)
-        return col.selectbox(label, options, index=index, key=key)
-
-    if ftype == "slider":
-        return col.slider(
-            label,
-            int(field.get("min", 0)),
-            int(field.get("max", 10)),
-            int(init),
-            key=key,
+        params.update(
+            allow_none=field.get("allow_none", False),
+            caster=caster,
+            placeholder=field.get("placeholder", "Leave blank if not measured"),
+            default_val=caster(field.get("min", 0)),
+            kwargs=kwargs,
         )
+    elif ftype == "select":
+        params["options"] = field.get("options", [])
+    elif ftype == "slider":
+        params.update(
+            fallback=_slider_fallback(field),
+            min_value=int(field.get("min", 0)),
+            max_value=int(field.get("max", 10)),
+        )
+    elif ftype == "textarea":
+        params["max_chars"] = field.get("max_chars", None)
 
-    if ftype == "text":
-        return col.text_input(label, value=str(init), key=key)
-
-    if ftype == "textarea":
-        max_chars = field.get("max_chars", None)
-        return col.text_area(label, value=str(init), key=key, max_chars=max_chars)
+    # Unknown types fall back to a plain text input
+    return partial(FIELD_RENDERERS.get(ftype, _render_text), **params)
 
-    if ftype == "time":
-        return col.time_input(label, value=init, key=key)
 
-    return col.text_input(label, value=str(init), key=key)
+# ================= UI CONSTRUCTOR CLASS ================= #
 
 
-# ================= UI CONSTRUCTOR CLASS ================= #
+# Columns shown in the History table (when the config defines them)
+HISTORY_COLUMNS = [
+    "_avg",
+    "sleep_hours",
+    "sleep_quality",
+    "fasting_glucose",
+    "hrv",
+    "gym",
+    "run_km",
+    "walking_steps",
+]
 
 
 class WellnessApp:
@@ -262,9 +736,10 @@ class WellnessApp:
         self.config = load_config(config_path)
         self.app_conf = self.config["app"]
         self.blocks_conf = self.config["blocks"]
+        self._compiled = compile_blocks(config_path)
 
-        data_file = self.app_conf.get("data_file", "./wellness_data.csv")
-        self.handler = WellnessDataHandler(data_file)
+        data_file = self.app_conf.get("data_file", "./wellness_data.feather")
+        self.handler = WellnessDataHandler(data_file, load_dtype_map(config_path))
 
     def setup_page(self):
         st.set_page_config(
@@ -278,6 +753,18 @@ class WellnessApp:
     def run(self):
         self.setup_page()
 
+        # Keep the parsed data per session, reloading only when the files on
+        # disk changed (e.g. a save from another tab or device)
+        key = self.handler.mtime_key()
+        if st.session_state.get("wellness_key") != key:
+            df = self.handler._ensure_date_column(self.handler.load_data())
+            st.session_state["wellness_df"] = df
+            st.session_state["date_index"] = build_date_index(df)
+            st.session_state["wellness_key"] = key
+        self.handler.df = st.session_state["wellness_df"]
+        self.handler.date_index = st.session_state["date_index"]
+        self.handler.data_key = st.session_state["wellness_key"]
+
         entry_day_str = get_entry_day()
         entry_data = self.handler.get_for_date(entry_day_str)
 
@@ -298,62 +785,58 @@ class WellnessApp:
             self.render_history()
 
     def render_blocks(self, entry_day_str: str, entry_data: dict):
-        for block in self.blocks_conf:
+        for block in self._compiled:
             block_id = block["id"]
             title = block["title"]
-            expanded = block.get("expanded", True)
-            save_label = block.get("save_label", "Save")
-            n_cols = block.get("n_cols", 1)
 
-            with st.expander(title, expanded=expanded):
-                cols = st.columns(n_cols)
+            with st.expander(title, expanded=block["expanded"]):
+                cols = st.columns(block["n_cols"])
                 values = {}
 
-                for field in block["fields"]:
-                    col_idx = field.get("col", 0)
-                    col_idx = max(0, min(col_idx, n_cols - 1))
-                    col = cols[col_idx]
-                    values[field["name"]] = render_field(
-                        field, col, entry_data, block_id
-                    )
+                for col_idx, name, key, renderer in block["fields"]:
+                    values[name] = renderer(cols[col_idx], entry_data.get(name), key)
 
-                if st.button(save_label, key=f"save__{block_id}"):
-                    self.handler.upsert_for_date(entry_day_str, values)
+                if st.button(block["save_label"], key=f"save__{block_id}"):
+                    st.session_state["wellness_df"] = self.handler.upsert_for_date(
+                        entry_day_str, values
+                    )
+                    st.session_state["date_index"] = self.handler.date_index
+                    st.session_state["wellness_key"] = self.handler.data_key
                     st.success(f"{title} saved.")
 
     def render_history(self):
         st.header("History")
-        df = self.handler.load_data()
+        df = self.handler.df
         if df.empty:
             st.info("No data yet.")
             return
 
         df = self.handler._ensure_date_column(df)
-        df_display = df.sort_values(by="timestamp", ascending=False)
-
-        for _, row in df_display.iterrows():
-            ts = row.get("timestamp", None)
-            if pd.isna(ts):
-                continue
-            ts_str = ts.strftime("%Y-%m-%d %H:%M")
-            avg_score = get_subjective_average(row)
-
-            with st.container():
-                st.subheader(f"📅 {ts_str}")
-                if avg_score == avg_score:
-                    st.metric("Overall Vibe", f"{avg_score}/10")
-                st.markdown(
-                    f"""
-                    **Sleep:** {row.get('sleep_hours', '–')}h (Q: {row.get('sleep_quality', '–')})  
-                    **Glucose:** {row.get('fasting_glucose', '–')} | **HRV:** {row.get('hrv', '–')}  
-                    **Exercise:** gym={row.get('gym', 0)}, run={row.get('run_km', 0)} km  
-                    **Steps:** {row.get('walking_steps', '–')}  
-                    """
-                )
+        if "timestamp" not in df.columns:
+            # Migrated from a CSV that never had one; rows get it on their next save
+            st.info("No timestamped entries yet.")
+            return
+        # Drop undated rows before sorting/scoring so neither works on them
+        df_display = df.dropna(subset=["timestamp"]).sort_values(
+            by="timestamp", ascending=False
+        )
+        df_display["_avg"] = get_subjective_averages(df_display)
+
+        # One table instead of a subheader/metric/markdown trio per day
+        df_show = df_display.assign(
+            Date=df_display["timestamp"].dt.strftime("%Y-%m-%d %H:%M")
+        )
+        cols = ["Date"] + [c for c in HISTORY_COLUMNS if c in df_show.columns]
+        df_show = df_show[cols].rename(columns={"_avg": "Vibe"})
+
+        latest = df_show["Vibe"].iloc[0] if len(df_show) else float("nan")
+        if latest == latest:
+            st.metric("Latest Vibe", f"{latest}/10")
+        st.dataframe(df_show, hide_index=True)
 
     def render_stats_tab(self):
         st.header("Stats (coming soon)")
-        st.info("This tab is ready for future plots / summaries from the same CSV.")
+        st.info("This tab is ready for future plots / summaries from the same data file.")
 
 
 # ================= ENTRY POINT ================= #